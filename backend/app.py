@@ -3,23 +3,40 @@ import io
 import os
 import json
 import time
+import stat
 import hashlib
 import logging
-from typing import Dict, Any, List, Tuple
+import functools
+import threading
+import contextlib
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Any, List, Optional, Tuple
 
 from flask import Flask, jsonify, request, send_file, abort, send_from_directory
-from pypdf import PdfReader, PdfWriter
-from pypdf.generic import NameObject, BooleanObject, NumberObject
+import fitz  # PyMuPDF
+
+try:
+    import fcntl
+except ImportError:  # Windows: no advisory file locks; rely on atomic replace only
+    fcntl = None
 
 # ---------------------------
 # Config & app factory
 # ---------------------------
 
-def create_app() -> Flask:
+# Request limits, checked before any PDF work. MAX_REQUEST_BYTES is enforced by Werkzeug
+# on the body stream itself (MAX_CONTENT_LENGTH), so chunked bodies are capped too.
+MAX_FIELDS = 5000
+MAX_REQUEST_BYTES = 2 * 1024 * 1024
+
+def create_app(warm_schema: Optional[bool] = None) -> Flask:
     here = os.path.dirname(os.path.abspath(__file__))
     files_dir = os.environ.get("FILES_DIR", os.path.join(here, "files"))
     schema_path = os.environ.get("SCHEMA_PATH", os.path.join(here, "fields_schema.json"))
     admin_key = os.environ.get("ADMIN_KEY")
+    if warm_schema is None:
+        warm_schema = os.environ.get("WARM_SCHEMA", "1") != "0"
     static_dir = os.path.join(here, "static")
 
     app = Flask(
@@ -27,7 +44,8 @@ def create_app() -> Flask:
         static_folder=static_dir if os.path.isdir(static_dir) else None,
         static_url_path="/static" if os.path.isdir(static_dir) else None,
     )
-    app.config.update(FILES_DIR=files_dir, SCHEMA_PATH=schema_path, ADMIN_KEY=admin_key)
+    app.config.update(FILES_DIR=files_dir, SCHEMA_PATH=schema_path, ADMIN_KEY=admin_key,
+                      WARM_SCHEMA=warm_schema, MAX_CONTENT_LENGTH=MAX_REQUEST_BYTES)
 
     logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
     app.logger.info(
@@ -37,6 +55,19 @@ def create_app() -> Flask:
 
     os.makedirs(files_dir, exist_ok=True)
 
+    # Warm the schema cache so the first /fields_schema or /combined_fields request
+    # isn't a cold parse (WARM_SCHEMA=0 turns this off)
+    if warm_schema:
+        def _warm_schema():
+            try:
+                load_or_build_schema(files_dir, schema_path)
+            except Exception:
+                app.logger.exception("Schema warm-up failed; it will be built on first request")
+
+        # Not a daemon: interpreter shutdown waits for the rebuild (and its process pool)
+        # to finish instead of killing it mid-write
+        threading.Thread(target=_warm_schema, name="schema-warmup").start()
+
     # Routes
     register_routes(app)
 
@@ -53,61 +84,63 @@ def create_app() -> Flask:
 # Utilities / core logic
 # ---------------------------
 
+_CANON_TABLE = str.maketrans("", "", " _")
+
 def canonicalize(name: str) -> str:
     """Lowercase and drop spaces/underscores -> for robust dedupe/matching."""
-    return "".join(ch for ch in name.lower() if ch not in {" ", "_"})
+    return name.translate(_CANON_TABLE).lower()
+
+def _pdf_entries(files_dir: str) -> List[os.DirEntry]:
+    with os.scandir(files_dir) as it:
+        return [e for e in it if e.name.lower().endswith(".pdf") and e.is_file()]
+
+def scan_pdfs(files_dir: str) -> List[Tuple[str, os.stat_result]]:
+    """(name, stat) for each PDF in files_dir, sorted case-insensitively; one scandir pass."""
+    pdfs = []
+    for e in _pdf_entries(files_dir):
+        try:
+            pdfs.append((e.name, e.stat()))
+        except FileNotFoundError:
+            continue  # deleted since the directory was read
+    pdfs.sort(key=lambda p: p[0].lower())
+    return pdfs
 
 def list_pdfs(files_dir: str) -> List[str]:
-    pdfs = [
-        f for f in os.listdir(files_dir)
-        if f.lower().endswith(".pdf") and os.path.isfile(os.path.join(files_dir, f))
-    ]
+    """PDF names only: no per-file stat beyond what scandir's is_file() needs."""
+    pdfs = [e.name for e in _pdf_entries(files_dir)]
     pdfs.sort(key=str.lower)
     return pdfs
 
-def _field_kind_from_annot(annot) -> str:
-    """
-    Map PDF /FT to simple kinds:
-      /Tx -> text, /Btn -> checkbox or radio (bit 15), /Ch -> treat as text, /Sig -> text
-    """
-    ft = annot.get("/FT")
-    if ft == NameObject("/Tx"):
-        return "text"
-    if ft == NameObject("/Ch"):
-        return "text"
-    if ft == NameObject("/Sig"):
-        return "text"
-    if ft == NameObject("/Btn"):
-        ff = annot.get("/Ff")
-        try:
-            flags = int(ff) if isinstance(ff, (int, NumberObject)) else 0
-        except Exception:
-            flags = 0
-        is_radio = bool(flags & (1 << 15))
-        return "radio" if is_radio else "checkbox"
-    return "text"
+# MuPDF widget type -> simple kind; anything else (text/combobox/listbox/signature) is "text".
+_WIDGET_KINDS: Dict[int, str] = {
+    fitz.PDF_WIDGET_TYPE_RADIOBUTTON: "radio",
+    fitz.PDF_WIDGET_TYPE_CHECKBOX: "checkbox",
+    fitz.PDF_WIDGET_TYPE_BUTTON: "checkbox",
+}
+_WIDGET_PUSHBUTTON = fitz.PDF_WIDGET_TYPE_BUTTON
+
+def _widget_kind(field_type: int) -> str:
+    return _WIDGET_KINDS.get(field_type, "text")
 
 def discover_fields_for_pdf(pdf_path: str) -> List[Dict[str, Any]]:
     """
-    Return FieldDef-like dicts unique by display name (/T):
+    Return FieldDef-like dicts unique by display name:
       [{ name, kind, occurrences }, ...]
     """
-    reader = PdfReader(pdf_path)
     counts: Dict[str, Dict[str, Any]] = {}
-    for page in reader.pages:
-        annots = page.get("/Annots") or []
-        for ref in annots:
-            annot = ref.get_object() if hasattr(ref, "get_object") else ref
-            if annot.get("/Subtype") != NameObject("/Widget"):
-                continue
-            name_obj = annot.get("/T")
-            if not name_obj:
-                continue
-            raw_name = str(name_obj)
-            kind = _field_kind_from_annot(annot)
-            if raw_name not in counts:
-                counts[raw_name] = {"name": raw_name, "kind": kind, "occurrences": 0}
-            counts[raw_name]["occurrences"] += 1
+    with fitz.open(pdf_path) as doc:
+        for page in doc:
+            for widget in page.widgets():
+                raw_name = widget.field_name
+                if not raw_name:
+                    continue
+                if raw_name not in counts:
+                    counts[raw_name] = {
+                        "name": raw_name,
+                        "kind": _widget_kind(widget.field_type),
+                        "occurrences": 0,
+                    }
+                counts[raw_name]["occurrences"] += 1
     return sorted(counts.values(), key=lambda d: d["name"].lower())
 
 def union_and_dedupe_fields(selected_pdfs: List[str], per_pdf_fields: Dict[str, List[Dict[str, Any]]]) -> List[Dict[str, Any]]:
@@ -115,6 +148,23 @@ def union_and_dedupe_fields(selected_pdfs: List[str], per_pdf_fields: Dict[str,
     Merge fields across selected PDFs into a union, deduped by canonical name.
     Keep first-seen display name/kind; merge occurrence counts by PDF.
     """
+    if len(selected_pdfs) == 1:
+        # Single PDF: fields are already sorted; reshape directly unless two names
+        # collide canonically
+        pdf = selected_pdfs[0]
+        fields = per_pdf_fields.get(pdf) or []
+        if len({canonicalize(f["name"]) for f in fields}) == len(fields):
+            return [
+                {
+                    "name": f["name"],
+                    "kind": f.get("kind", "text"),
+                    "required": False,
+                    "options": None,
+                    "occurrences": {pdf: int(f.get("occurrences", 1))},
+                }
+                for f in fields
+            ]
+
     merged: Dict[str, Dict[str, Any]] = {}
     for pdf in selected_pdfs:
         fields = per_pdf_fields.get(pdf) or []
@@ -138,66 +188,190 @@ def union_and_dedupe_fields(selected_pdfs: List[str], per_pdf_fields: Dict[str,
     out.sort(key=lambda d: d["name"].lower())
     return out
 
-def _compute_version(files_dir: str, per_pdf: List[Dict[str, Any]]) -> str:
+# Bump when discovery output changes for the same files: invalidates the fields cache,
+# stored schemas and the client-facing version.
+SCHEMA_CODE_VERSION = "3"
+
+def _compute_version(pdf_stats: List[Tuple[str, os.stat_result]]) -> str:
     """
-    Version hash from filenames + mtimes + sizes + field names/kinds/counts (stable for cache busting).
+    Version hash from filenames + mtimes + sizes + SCHEMA_CODE_VERSION (stable for cache busting).
     """
-    h = hashlib.sha256()
-    for name in list_pdfs(files_dir):
-        path = os.path.join(files_dir, name)
-        st = os.stat(path)
+    h = hashlib.blake2b(digest_size=8)
+    h.update(SCHEMA_CODE_VERSION.encode("ascii"))
+    for name, st in pdf_stats:
         h.update(name.encode("utf-8"))
-        h.update(str(int(st.st_mtime)).encode("ascii"))
+        h.update(str(st.st_mtime_ns).encode("ascii"))
         h.update(str(st.st_size).encode("ascii"))
-    for entry in per_pdf:
-        h.update(entry["pdf"].encode("utf-8"))
-        for f in entry.get("fields", []):
-            h.update(f["name"].lower().encode("utf-8"))
-            h.update((f.get("kind") or "").encode("utf-8"))
-            h.update(str(int(f.get("occurrences", 0))).encode("ascii"))
-    return h.hexdigest()[:16]
+    return h.hexdigest()
+
+def _fields_cache_path(schema_path: str) -> str:
+    """Per-schema sidecar: fields_schema.json -> fields_schema.fields_cache.json."""
+    return os.path.splitext(schema_path)[0] + ".fields_cache.json"
+
+def _load_fields_cache(cache_path: str) -> Dict[str, Dict[str, Any]]:
+    """
+    Sidecar cache: { code_version, files: { filename: { mtime, size, fields } } }.
+    Missing/corrupt or written by other discovery code (SCHEMA_CODE_VERSION) -> empty.
+    """
+    try:
+        with open(cache_path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+    except Exception:
+        return {}
+    if not isinstance(data, dict) or data.get("code_version") != SCHEMA_CODE_VERSION:
+        return {}
+    files = data.get("files")
+    return files if isinstance(files, dict) else {}
+
+def _write_json_atomic(path: str, data: Any, indent: Optional[int] = None) -> None:
+    """Encode once, write once to a temp file, then rename over `path`."""
+    payload = json.dumps(data, ensure_ascii=False, indent=indent)
+    # Per-thread temp name: warm-up and request threads may write concurrently
+    tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write(payload)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+    except BaseException:
+        # Don't leave a half-written temp file behind (disk full, interrupt, ...)
+        try:
+            os.unlink(tmp)
+        except OSError:
+            pass
+        raise
+    if os.name == "posix":
+        # Make the rename itself durable; Windows can't open directories for fsync
+        dir_fd = os.open(os.path.dirname(path) or ".", os.O_RDONLY)
+        try:
+            os.fsync(dir_fd)
+        finally:
+            os.close(dir_fd)
+
+@contextlib.contextmanager
+def _schema_lock(schema_path: str):
+    """Exclusive lock on `<schema_path>.lock`; concurrent rebuilds run one at a time."""
+    if fcntl is None:
+        yield
+        return
+    with open(schema_path + ".lock", "a") as lock_file:
+        fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
 
 def regenerate_schema(files_dir: str, schema_path: str) -> Dict[str, Any]:
+    """
+    Rebuild the schema, re-parsing only PDFs whose (mtime, size) changed
+    since the last run; unchanged files reuse their cached fields. Changed
+    files are parsed in parallel across processes (parsing is CPU-bound).
+    Rebuilds are serialized by a file lock; a waiter then finds the cache warm.
+    """
+    with _schema_lock(schema_path):
+        return _regenerate_schema(files_dir, schema_path)
+
+# Spawned workers re-import Flask and fitz (~0.5 s); smaller batches parse faster inline.
+PARSE_POOL_MIN_FILES = 16
+
+def _usable_cpus() -> int:
+    """CPUs this process may run on (respects affinity/container cpusets where available)."""
+    if hasattr(os, "sched_getaffinity"):
+        return len(os.sched_getaffinity(0)) or 1
+    return os.cpu_count() or 1
+
+def _regenerate_schema(files_dir: str, schema_path: str) -> Dict[str, Any]:
+    cache_path = _fields_cache_path(schema_path)
+    cache = _load_fields_cache(cache_path)
+    pdf_stats = scan_pdfs(files_dir)
+    parsed: Dict[str, List[Dict[str, Any]]] = {}
+    stale: List[str] = []
+    for pdf, st in pdf_stats:
+        entry = cache.get(pdf)
+        if entry and entry.get("mtime") == st.st_mtime_ns and entry.get("size") == st.st_size:
+            parsed[pdf] = entry["fields"]
+        else:
+            stale.append(pdf)
+
+    stale_paths = [os.path.join(files_dir, pdf) for pdf in stale]
+    workers = min(len(stale_paths), _usable_cpus())
+    if workers > 1 and len(stale_paths) >= PARSE_POOL_MIN_FILES:
+        # Spawn, not fork: we run on request/warm-up threads, and forking a
+        # multi-threaded process can deadlock
+        with ProcessPoolExecutor(max_workers=workers,
+                                 mp_context=multiprocessing.get_context("spawn")) as ex:
+            results = list(ex.map(discover_fields_for_pdf, stale_paths))
+    else:
+        results = [discover_fields_for_pdf(path) for path in stale_paths]
+    parsed.update(zip(stale, results))
+
+    new_cache: Dict[str, Dict[str, Any]] = {}
     per_pdf = []
-    for pdf in list_pdfs(files_dir):
-        fields = discover_fields_for_pdf(os.path.join(files_dir, pdf))
-        per_pdf.append({"pdf": pdf, "fields": fields})
+    for pdf, st in pdf_stats:
+        fields = parsed[pdf]
+        new_cache[pdf] = {"mtime": st.st_mtime_ns, "size": st.st_size, "fields": fields}
+        per_pdf.append({"pdf": pdf, "mtime": st.st_mtime_ns, "size": st.st_size, "fields": fields})
+    if new_cache != cache:
+        _write_json_atomic(cache_path, {"code_version": SCHEMA_CODE_VERSION, "files": new_cache})
     data = {
-        "version": _compute_version(files_dir, per_pdf),
+        "version": _compute_version(pdf_stats),
+        "schema_code_version": SCHEMA_CODE_VERSION,
         "generated_at": int(time.time()),
         "pdfs": [p["pdf"] for p in per_pdf],
         "per_pdf": per_pdf,
         "notes": ["Union-of-fields frontend; dedupe by case-insensitive name; spaces/underscores ignored."],
     }
-    with open(schema_path, "w", encoding="utf-8") as f:
-        json.dump(data, f, ensure_ascii=False, indent=2)
+    _write_json_atomic(schema_path, data, indent=2)
     return data
 
+# schema_path -> (mtime_ns, data); reused while the schema file is unchanged on disk
+_SCHEMA_CACHE: Dict[str, Tuple[int, Dict[str, Any]]] = {}
+
+def _schema_mtime(schema_path: str) -> Optional[int]:
+    try:
+        return os.stat(schema_path).st_mtime_ns
+    except OSError:
+        return None
+
+def remember_schema(schema_path: str, data: Dict[str, Any]) -> None:
+    """Cache freshly built schema data against the file it was just written to."""
+    mtime = _schema_mtime(schema_path)
+    if mtime is None:
+        _SCHEMA_CACHE.pop(schema_path, None)
+    else:
+        _SCHEMA_CACHE[schema_path] = (mtime, data)
+
 def load_or_build_schema(files_dir: str, schema_path: str) -> Dict[str, Any]:
-    if os.path.isfile(schema_path):
+    mtime = _schema_mtime(schema_path)
+    if mtime is not None:
+        cached = _SCHEMA_CACHE.get(schema_path)
+        if cached is not None and cached[0] == mtime:
+            return cached[1]
         try:
             with open(schema_path, "r", encoding="utf-8") as f:
                 data = json.load(f)
-                if "version" in data:
+                # Schemas from older discovery code (e.g. pypdf-era partial names) are stale
+                if "version" in data and data.get("schema_code_version") == SCHEMA_CODE_VERSION:
+                    _SCHEMA_CACHE[schema_path] = (mtime, data)
                     return data
         except Exception:
             pass
-    return regenerate_schema(files_dir, schema_path)
-
-def _page_field_names_with_types(page) -> List[Tuple[str, str]]:
-    names: List[Tuple[str, str]] = []
-    annots = page.get("/Annots") or []
-    for ref in annots:
-        annot = ref.get_object() if hasattr(ref, "get_object") else ref
-        if annot.get("/Subtype") != NameObject("/Widget"):
-            continue
-        name_obj = annot.get("/T")
-        if not name_obj:
-            continue
-        raw_name = str(name_obj)
-        kind = _field_kind_from_annot(annot)
-        names.append((raw_name, kind))
-    return names
+    data = regenerate_schema(files_dir, schema_path)
+    remember_schema(schema_path, data)
+    return data
+
+# (schema dict, { pdf: fields }); rebuilt whenever load_or_build_schema hands out a new dict
+_SCHEMA_PER_PDF_INDEX: Optional[Tuple[Dict[str, Any], Dict[str, List[Dict[str, Any]]]]] = None
+
+def per_pdf_index(data: Dict[str, Any]) -> Dict[str, List[Dict[str, Any]]]:
+    global _SCHEMA_PER_PDF_INDEX
+    cached = _SCHEMA_PER_PDF_INDEX
+    if cached is not None and cached[0] is data:
+        return cached[1]
+    index = {item["pdf"]: item["fields"] for item in data.get("per_pdf", [])}
+    _SCHEMA_PER_PDF_INDEX = (data, index)
+    return index
 
 def _coerce_checkbox(value: Any) -> bool:
     if isinstance(value, bool):
@@ -209,43 +383,127 @@ def _coerce_checkbox(value: Any) -> bool:
         return v in {"1", "true", "yes", "y", "on", "checked"}
     return False
 
-def fill_pdf_bytes(pdf_path: str, field_values: Dict[str, Any]) -> bytes:
+@functools.lru_cache(maxsize=32)
+def _load_template(pdf_path: str, mtime_ns: int, size: int) -> bytes:
     """
-    Fill a PDF: match input keys by canonicalized name so repeated widgets
-    and minor name variations are all set.
+    Raw bytes of a source PDF. (mtime_ns, size) are part of the cache key only,
+    so an edited file misses the cache and is re-read.
     """
-    reader = PdfReader(pdf_path)
-    writer = PdfWriter()
-    writer.append(reader)
-
-    normalized_inputs: Dict[str, Any] = {canonicalize(k): v for k, v in field_values.items()}
-
-    for page in writer.pages:
-        page_fields = _page_field_names_with_types(page)
-        to_update: Dict[str, Any] = {}
-        for actual_name, kind in page_fields:
-            canon = canonicalize(actual_name)
-            if canon not in normalized_inputs:
-                continue
-            raw_val = normalized_inputs[canon]
-            if kind == "checkbox":
-                to_update[actual_name] = _coerce_checkbox(raw_val)
-            elif kind == "radio":
-                to_update[actual_name] = "" if raw_val is None else str(raw_val)
-            else:
-                to_update[actual_name] = "" if raw_val is None else str(raw_val)
-        if to_update:
-            writer.update_page_form_field_values(page, to_update)
-
-    try:
-        if "/AcroForm" in writer._root_object:
-            acro = writer._root_object["/AcroForm"]
-            acro.update({NameObject("/NeedAppearances"): BooleanObject(True)})
-    except Exception:
-        pass
+    with open(pdf_path, "rb") as f:
+        return f.read()
+
+# pdf -> ((mtime_ns, size), { canonical name: widget count })
+_WidgetCounts = Dict[str, Tuple[Tuple[Any, Any], Dict[str, int]]]
+# (schema dict, counts by pdf); rebuilt whenever load_or_build_schema hands out a new dict
+_SCHEMA_WIDGET_COUNTS: Optional[Tuple[Dict[str, Any], _WidgetCounts]] = None
+
+def _widget_counts_index(data: Dict[str, Any]) -> _WidgetCounts:
+    global _SCHEMA_WIDGET_COUNTS
+    cached = _SCHEMA_WIDGET_COUNTS
+    if cached is not None and cached[0] is data:
+        return cached[1]
+    index: _WidgetCounts = {}
+    for entry in data.get("per_pdf", []):
+        counts: Dict[str, int] = {}
+        for f in entry["fields"]:
+            canon = canonicalize(f["name"])
+            counts[canon] = counts.get(canon, 0) + int(f.get("occurrences", 1))
+        index[entry["pdf"]] = ((entry.get("mtime"), entry.get("size")), counts)
+    _SCHEMA_WIDGET_COUNTS = (data, index)
+    return index
+
+def _schema_widget_counts(schema_path: str, pdf: str,
+                          st: os.stat_result) -> Optional[Dict[str, int]]:
+    """
+    Canonical field name -> widget count for `pdf`, from the in-memory schema, but only
+    when that entry was built from this exact file (mtime_ns, size). Otherwise None, and
+    the fill walks every page. Never loads or builds the schema itself.
+    """
+    cached = _SCHEMA_CACHE.get(schema_path)
+    if cached is None:
+        return None
+    entry = _widget_counts_index(cached[1]).get(pdf)
+    if entry is None or entry[0] != (st.st_mtime_ns, st.st_size):
+        return None
+    return entry[1]
+
+def fill_pdf_bytes(pdf_bytes: bytes, field_values: Dict[str, Any],
+                   widget_counts: Optional[Dict[str, int]] = None) -> bytes:
+    """
+    Fill a PDF: match input keys by canonicalized name so repeated widgets
+    and minor name variations are all set. MuPDF regenerates appearance
+    streams on widget.update(), so no /NeedAppearances flag is needed.
 
-    out = io.BytesIO()
-    writer.write(out)
+    widget_counts (canonical name -> widget count for this PDF) lets the page
+    walk stop once every widget of every requested field has been visited.
+    """
+    if not field_values:
+        return pdf_bytes  # nothing to fill; skip the parse/re-serialize round trip
+
+    # Repeated widgets share a name; canonicalize each distinct name once per request.
+    canon_cache: Dict[str, str] = {}
+
+    def canon_of(name: str) -> str:
+        canon = canon_cache.get(name)
+        if canon is None:
+            canon = canon_cache[name] = canonicalize(name)
+        return canon
+
+    normalized_inputs: Dict[str, Any] = {canon_of(k): v for k, v in field_values.items()}
+
+    remaining: Optional[int] = None
+    if widget_counts is not None:
+        remaining = sum(widget_counts.get(canon, 0) for canon in normalized_inputs)
+        if not remaining:
+            return pdf_bytes  # no requested field exists in this PDF
+
+    # Each request opens its own Document from the cached bytes; Documents are not
+    # shared across threads.
+    with fitz.open(stream=pdf_bytes, filetype="pdf") as doc:
+        for page in doc:
+            for widget in page.widgets():
+                actual_name = widget.field_name
+                if not actual_name:
+                    continue
+                canon = canon_of(actual_name)
+                if canon not in normalized_inputs:
+                    continue
+                if remaining is not None:
+                    remaining -= 1
+                field_type = widget.field_type
+                if field_type == _WIDGET_PUSHBUTTON:
+                    continue  # push buttons carry no value
+                raw_val = normalized_inputs[canon]
+                kind = _widget_kind(field_type)
+                if kind == "checkbox":
+                    value = widget.on_state() if _coerce_checkbox(raw_val) else "Off"
+                elif kind == "radio":
+                    # MuPDF treats any truthy value (including "Off") as "select this kid",
+                    # and writing False resets the group's /V: only touch kids whose state flips.
+                    wanted = "" if raw_val is None else str(raw_val)
+                    want_on = wanted == widget.on_state()
+                    if want_on != (widget.field_value not in (False, "Off")):
+                        widget.field_value = want_on
+                        widget.update()
+                    continue
+                else:
+                    value = "" if raw_val is None else str(raw_val)
+                    if not value and widget.field_value:
+                        # MuPDF skips writing empty text, so clear /V directly before regenerating
+                        doc.xref_set_key(widget.xref, "V", "()")
+                        widget.field_value = value
+                        widget.update()
+                        continue
+                # Only write back (and regenerate the appearance stream) for widgets
+                # that actually change.
+                if widget.field_value != value:
+                    widget.field_value = value
+                    widget.update()
+            if remaining is not None and remaining <= 0:
+                break
+
+        out = io.BytesIO()
+        doc.save(out, garbage=0, deflate=True, incremental=False)
     return out.getvalue()
 
 
@@ -276,7 +534,7 @@ def register_routes(app: Flask) -> None:
             abort(400, description="Body must be { pdfs: string[] }")
 
         data = load_or_build_schema(app.config["FILES_DIR"], app.config["SCHEMA_PATH"])
-        per_pdf = {item["pdf"]: item["fields"] for item in data.get("per_pdf", [])}
+        per_pdf = per_pdf_index(data)
         fields = union_and_dedupe_fields(pdfs, per_pdf)
 
         notes: List[str] = []
@@ -288,6 +546,10 @@ def register_routes(app: Flask) -> None:
 
     @app.post("/fill")
     def fill():
+        # The body stream is capped at MAX_CONTENT_LENGTH; a chunked body that reaches the cap
+        # is truncated rather than rejected, so a full-length read means "too large".
+        if len(request.get_data()) >= MAX_REQUEST_BYTES:
+            abort(413, description="Request body too large")
         body = request.get_json(silent=True) or {}
         pdf_filename = body.get("pdf_filename")
         field_values = body.get("field_values", {})
@@ -297,15 +559,31 @@ def register_routes(app: Flask) -> None:
             abort(400, description="pdf_filename is required and must end with .pdf")
         if not isinstance(field_values, dict):
             abort(400, description="field_values must be an object")
+        if len(field_values) > MAX_FIELDS:
+            abort(413, description=f"too many fields (max {MAX_FIELDS})")
 
         safe = os.path.basename(pdf_filename)
         source_path = os.path.join(app.config["FILES_DIR"], safe)
-        if not os.path.isfile(source_path):
+        try:
+            st = os.stat(source_path)
+        except OSError:
+            abort(404, description="PDF not found")
+        if not stat.S_ISREG(st.st_mode):
             abort(404, description="PDF not found")
-
-        pdf_bytes = fill_pdf_bytes(source_path, field_values)
         download_name = download_name or f"{os.path.splitext(safe)[0]}_filled.pdf"
 
+        if not field_values:
+            # Nothing to fill: stream the template straight from disk
+            return send_from_directory(app.config["FILES_DIR"], safe,
+                                       mimetype="application/pdf",
+                                       as_attachment=True,
+                                       download_name=download_name,
+                                       max_age=0)
+
+        template = _load_template(source_path, st.st_mtime_ns, st.st_size)
+        counts = _schema_widget_counts(app.config["SCHEMA_PATH"], safe, st)
+        pdf_bytes = fill_pdf_bytes(template, field_values, counts)
+
         return send_file(io.BytesIO(pdf_bytes),
                          mimetype="application/pdf",
                          as_attachment=True,
@@ -321,6 +599,7 @@ def register_routes(app: Flask) -> None:
             if provided != required:
                 abort(403, description="Admin key required")
         data = regenerate_schema(app.config["FILES_DIR"], app.config["SCHEMA_PATH"])
+        remember_schema(app.config["SCHEMA_PATH"], data)
         return jsonify({"ok": True, "version": data["version"]})
 
 
@@ -330,5 +609,7 @@ def register_routes(app: Flask) -> None:
 
 if __name__ == "__main__":
     # Allow `python backend/app.py` as a quick run (dev only)
-    app = create_app()
+    # With debug=True this process only supervises the reloader child; let the child warm
+    in_reloader_child = os.environ.get("WERKZEUG_RUN_MAIN") == "true"
+    app = create_app(warm_schema=None if in_reloader_child else False)
     app.run(host="127.0.0.1", port=5000, debug=True)
@@ -0,0 +1,103 @@
+# backend/test_app.py
+# Regression tests for fill_pdf_bytes around MuPDF widget behavior.
+# pip install -r backend/requirements-dev.txt && pytest backend
+import fitz  # PyMuPDF
+import pytest
+
+from app import fill_pdf_bytes
+
+
+def _empty_stream(doc) -> int:
+    xref = doc.get_new_xref()
+    doc.update_object(xref, "<<>>")
+    doc.update_stream(xref, b"")
+    return xref
+
+
+def _make_form(radio_on=None, checkbox_on=True, note="prefilled") -> bytes:
+    """
+    One page with: a 'color' radio group (parent field + /Kids Red, Blue),
+    an 'agree' checkbox and a 'note' text field.
+    """
+    doc = fitz.open()
+    page = doc.new_page(width=300, height=300)
+
+    cb = fitz.Widget()
+    cb.field_name = "agree"
+    cb.field_type = fitz.PDF_WIDGET_TYPE_CHECKBOX
+    cb.rect = fitz.Rect(10, 100, 30, 120)
+    cb.field_value = checkbox_on
+    page.add_widget(cb)
+
+    tx = fitz.Widget()
+    tx.field_name = "note"
+    tx.field_type = fitz.PDF_WIDGET_TYPE_TEXT
+    tx.rect = fitz.Rect(10, 150, 200, 170)
+    tx.field_value = note
+    page.add_widget(tx)
+
+    # Radio group built by hand so the kids hang off a shared parent field via /Kids
+    parent = doc.get_new_xref()
+    kids = []
+    for i, state in enumerate(("Red", "Blue")):
+        kid = doc.get_new_xref()
+        on_ap, off_ap = _empty_stream(doc), _empty_stream(doc)
+        y = 10 + 30 * i
+        doc.update_object(kid, (
+            f"<< /Type /Annot /Subtype /Widget /Parent {parent} 0 R /P {page.xref} 0 R "
+            f"/Rect [10 {y} 30 {y + 20}] /AS /{state if radio_on == state else 'Off'} "
+            f"/AP << /N << /{state} {on_ap} 0 R /Off {off_ap} 0 R >> >> >>"
+        ))
+        kids.append(kid)
+    kid_refs = " ".join(f"{k} 0 R" for k in kids)
+    doc.update_object(parent, (
+        f"<< /FT /Btn /Ff 49152 /T (color) /V /{radio_on or 'Off'} /Kids [{kid_refs}] >>"
+    ))
+
+    annots = doc.xref_get_key(page.xref, "Annots")[1].strip("[]")
+    doc.xref_set_key(page.xref, "Annots", f"[{annots} {kid_refs}]")
+    cat = doc.pdf_catalog()
+    fields = doc.xref_get_key(cat, "AcroForm/Fields")[1].strip("[]")
+    doc.xref_set_key(cat, "AcroForm/Fields", f"[{fields} {parent} 0 R]")
+    return doc.tobytes()
+
+
+def _read(pdf_bytes: bytes):
+    """(radio kid /AS states, checkbox value, note value) of a filled form."""
+    with fitz.open(stream=pdf_bytes, filetype="pdf") as doc:
+        widgets = list(doc[0].widgets())
+        radio = [doc.xref_get_key(w.xref, "AS")[1] for w in widgets if w.field_name == "color"]
+        values = {w.field_name: w.field_value for w in widgets if w.field_name != "color"}
+    return radio, values["agree"], values["note"]
+
+
+@pytest.mark.parametrize("preselected", [None, "Red"])
+@pytest.mark.parametrize("value, expected", [
+    ("Red", ["/Red", "/Off"]),
+    ("Blue", ["/Off", "/Blue"]),
+    (None, ["/Off", "/Off"]),
+    ("", ["/Off", "/Off"]),
+    ("Purple", ["/Off", "/Off"]),
+])
+def test_radio_kids_select_clear_and_no_match(preselected, value, expected):
+    radio, _, _ = _read(fill_pdf_bytes(_make_form(radio_on=preselected), {"color": value}))
+    assert radio == expected
+
+
+@pytest.mark.parametrize("value", [False, "no", "off", 0])
+def test_checked_checkbox_can_be_unchecked(value):
+    _, agree, _ = _read(fill_pdf_bytes(_make_form(checkbox_on=True), {"agree": value}))
+    assert agree == "Off"
+
+
+@pytest.mark.parametrize("value", ["", None])
+def test_prefilled_text_is_cleared(value):
+    _, _, note = _read(fill_pdf_bytes(_make_form(note="prefilled"), {"note": value}))
+    assert note == ""
+
+
+def test_text_and_checkbox_are_set():
+    _, agree, note = _read(fill_pdf_bytes(_make_form(checkbox_on=False, note=""),
+                                          {"agree": "yes", "Note": "hello"}))
+    assert agree != "Off"
+    assert note == "hello"